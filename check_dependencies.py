@@ -4,11 +4,23 @@
 检查构建AppImage所需的所有依赖
 """
 
+import os
 import subprocess
 import sys
 import shutil
+from importlib.metadata import version, PackageNotFoundError
 from pathlib import Path
 
+# 构建所需的项目文件，以 "/" 结尾的条目必须是目录
+REQUIRED_PROJECT_FILES = (
+    "main.py",
+    ".venv",
+    "icon/",
+    "config/",
+    "pyproject.toml",
+    "requirements.txt",
+)
+
 
 def check_python_packages():
     """检查Python包依赖"""
@@ -39,12 +51,11 @@ def check_python_packages():
                 missing_packages.append(package)
                 
     except (subprocess.CalledProcessError, FileNotFoundError):
-        # 回退到导入检查
+        # 回退到发行包元数据检查，只读取安装信息而不导入（执行）模块
         for package in required_packages:
             try:
-                __import__(package.replace('-', '_'))
-                print(f"✓ {package}")
-            except ImportError:
+                print(f"✓ {package} ({version(package)})")
+            except PackageNotFoundError:
                 print(f"❌ {package} (未安装)")
                 missing_packages.append(package)
     
@@ -86,20 +97,17 @@ def check_project_structure():
     print("\n=== 项目结构检查 ===")
     
     project_root = Path.cwd()
-    required_files = [
-        "main.py",
-        ".venv",
-        "icon/",
-        "config/",
-        "pyproject.toml",
-        "requirements.txt",
-    ]
     
     missing_files = []
     
-    for file_path in required_files:
-        full_path = project_root / file_path
-        if full_path.exists():
+    # 一次扫描根目录，代替逐个 exists() 探测
+    with os.scandir(project_root) as it:
+        present = {entry.name: entry.is_dir() for entry in it}
+    
+    for file_path in REQUIRED_PROJECT_FILES:
+        name = file_path.rstrip("/")
+        found = name in present and (present[name] or not file_path.endswith("/"))
+        if found:
             print(f"✓ {file_path}")
         else:
             print(f"❌ {file_path} (不存在)")
@@ -5,9 +5,8 @@
 """
 
 import os
-import time
 from PySide6.QtWidgets import QMainWindow
-from PySide6.QtCore import QUrl, QTimer
+from PySide6.QtCore import Qt, QUrl, QTimer
 from PySide6.QtGui import QIcon
 from PySide6.QtWebEngineWidgets import QWebEngineView
 from PySide6.QtWebEngineCore import QWebEnginePage
@@ -286,6 +285,7 @@ class NetEaseMusicWindow(QMainWindow):
         try:
             # 创建定时器，定期检查登录数据状态
             self.enhanced_login_timer = QTimer()
+            self.enhanced_login_timer.setTimerType(Qt.TimerType.CoarseTimer)
             self.enhanced_login_timer.timeout.connect(self.enhanced_login_check)
             self.enhanced_login_timer.start(10000)  # 每10秒检查一次
             
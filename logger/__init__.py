@@ -9,7 +9,6 @@ import os
 import sys
 import logging
 import logging.config
-import traceback
 import time
 from typing import Optional, Dict, Any
 from pathlib import Path
@@ -32,6 +32,10 @@ class AsyncFileHandler(logging.Handler):
         while True:
             try:
                 record = self.queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            
+            try:
                 if record is None:  # 停止信号
                     break
                 
@@ -39,13 +43,12 @@ class AsyncFileHandler(logging.Handler):
                 with open(self.filename, self.mode, encoding=self.encoding) as f:
                     f.write(self.format(record) + '\n')
                     f.flush()
-                
-                self.queue.task_done()
-            except queue.Empty:
-                continue
             except Exception as e:
                 # 避免日志记录错误导致无限循环
                 print(f"AsyncFileHandler error: {e}")
+            finally:
+                # 无论成功与否都要标记完成，否则flush()会一直等待
+                self.queue.task_done()
     
     def emit(self, record):
         """发送记录到队列"""
@@ -55,10 +58,16 @@ class AsyncFileHandler(logging.Handler):
             # 队列满时丢弃旧记录
             try:
                 self.queue.get_nowait()
+                self.queue.task_done()
                 self.queue.put_nowait(record)
             except queue.Empty:
                 pass
     
+    def flush(self):
+        """等待已提交的记录全部写入文件"""
+        if self.thread.is_alive():
+            self.queue.join()
+    
     def close(self):
         """关闭处理器"""
         self.queue.put(None)  # 发送停止信号
@@ -10,6 +10,7 @@ import sys
 import subprocess
 import threading
 import time
+from collections import deque
 from tkinter import ttk, messagebox, filedialog, scrolledtext
 import tkinter as tk
 from pathlib import Path
@@ -20,6 +21,17 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 DISH_DIR = PROJECT_ROOT / "dish"
 BUILD_LOGS_DIR = PROJECT_ROOT / "build_logs"
 
+# 日志级别 -> (文本标签, 前缀, 颜色)
+LOG_LEVEL_STYLES = {
+    "ERROR": ("error", "❌", "red"),
+    "WARNING": ("warning", "⚠️", "orange"),
+    "SUCCESS": ("success", "✅", "green"),
+    "INFO": ("info", "ℹ️", "black"),
+}
+
+# 脚本输出合并刷新到日志框的间隔（毫秒）
+OUTPUT_FLUSH_INTERVAL_MS = 50
+
 class PackagingGUI:
     def __init__(self, root):
         self.root = root
@@ -34,6 +46,10 @@ class PackagingGUI:
         self.current_process = None
         self.output_thread = None
         
+        # 脚本输出缓冲，由主线程定时批量写入日志框
+        self._output_buffer = deque()
+        self._output_flush_scheduled = False
+        
         # 创建界面
         self.create_widgets()
         
@@ -126,6 +142,10 @@ class PackagingGUI:
         self.log_text = scrolledtext.ScrolledText(log_frame, height=15, wrap=tk.WORD)
         self.log_text.grid(row=0, column=0, sticky="wens")
         
+        # 文本标签颜色只需配置一次
+        for tag, _, color in LOG_LEVEL_STYLES.values():
+            self.log_text.tag_configure(tag, foreground=color)
+        
         # 清空日志按钮
         clear_button = ttk.Button(log_frame, text="清空日志", 
                              command=self.clear_log)
@@ -188,27 +208,8 @@ class PackagingGUI:
         """添加日志消息"""
         timestamp = time.strftime("%H:%M:%S")
         
-        # 根据级别设置颜色
-        if level == "ERROR":
-            tag = "error"
-            prefix = "❌"
-        elif level == "WARNING":
-            tag = "warning" 
-            prefix = "⚠️"
-        elif level == "SUCCESS":
-            tag = "success"
-            prefix = "✅"
-        else:
-            tag = "info"
-            prefix = "ℹ️"
-        
-        # 配置文本标签
-        self.log_text.tag_configure(tag, foreground={
-            "ERROR": "red",
-            "WARNING": "orange", 
-            "SUCCESS": "green",
-            "INFO": "black"
-        }.get(level, "black"))
+        # 根据级别选择标签和前缀
+        tag, prefix, _ = LOG_LEVEL_STYLES.get(level, LOG_LEVEL_STYLES["INFO"])
         
         # 插入消息
         self.log_text.insert(tk.END, f"[{timestamp}] {prefix} {message}\n", tag)
@@ -296,20 +297,48 @@ class PackagingGUI:
                     return_code = self.current_process.poll()  # 在进程结束时获取返回码
                     break
                 if output and output.strip():  # 确保输出不为空
-                    self.root.after(0, lambda msg=output.strip(): self.log_message(msg))
+                    self._queue_output(output.strip())
+            
+            # 先写出剩余的缓冲输出，保证结束消息排在最后
+            self.root.after(0, self._flush_output)
             
             # 使用已经获取的返回码
             if return_code == 0:
-                self.log_message(f"进程正常结束，返回码: {return_code}", "SUCCESS")
+                self.root.after(0, lambda: self.log_message(f"进程正常结束，返回码: {return_code}", "SUCCESS"))
                 self.root.after(0, lambda: self.on_packaging_success(mode))
             else:
-                self.log_message(f"进程异常结束，返回码: {return_code}", "ERROR")
+                self.root.after(0, lambda: self.log_message(f"进程异常结束，返回码: {return_code}", "ERROR"))
                 self.root.after(0, lambda: self.on_packaging_failed(mode, return_code))
                 
         except Exception as e:
             self.root.after(0, lambda: self.log_message(f"打包过程出错: {e}", "ERROR"))
             self.root.after(0, self.reset_ui)
     
+    def _queue_output(self, message):
+        """缓冲一行脚本输出（在读取线程中调用）"""
+        self._output_buffer.append(message)
+        if not self._output_flush_scheduled:
+            self._output_flush_scheduled = True
+            self.root.after(OUTPUT_FLUSH_INTERVAL_MS, self._flush_output)
+    
+    def _flush_output(self):
+        """将缓冲的脚本输出一次性写入日志框"""
+        self._output_flush_scheduled = False
+        if not self._output_buffer:
+            return
+        
+        lines = []
+        while self._output_buffer:
+            lines.append(self._output_buffer.popleft())
+        
+        timestamp = time.strftime("%H:%M:%S")
+        tag, prefix, _ = LOG_LEVEL_STYLES["INFO"]
+        text = "".join(f"[{timestamp}] {prefix} {line}\n" for line in lines)
+        
+        # 一批输出只插入和滚动一次
+        self.log_text.insert(tk.END, text, tag)
+        self.log_text.see(tk.END)
+    
     def create_clean_script(self):
         """创建清理脚本"""
         clean_script = SCRIPT_DIR / "clean_temp_files.sh"
@@ -5,70 +5,30 @@ PipeWire服务管理器
 处理PipeWire音频服务的检测、重启和状态管理
 """
 
-import os
 import time
-import subprocess
+import shlex
+import shutil
 from typing import Optional, Dict, Any, Callable
 from pathlib import Path
-from PySide6.QtCore import QObject, Signal, QThread
+from PySide6.QtCore import QObject, Signal, QProcess, QTimer
+from PySide6.QtDBus import QDBus, QDBusConnection, QDBusMessage
 from PySide6.QtWidgets import QApplication
 
 from logger import get_logger
 
 
-class PipewireRestartThread(QThread):
-    """异步执行PipeWire重启的工作线程"""
-    
-    # 信号定义
-    restart_started = Signal()
-    restart_completed = Signal(bool, str)  # success, message
-    restart_failed = Signal(str)  # error_message
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.logger = get_logger("pipewire_restart_thread")
-        self._restart_command = None
-        
-    def set_restart_command(self, command: str):
-        """设置重启命令"""
-        self._restart_command = command
-        
-    def run(self):
-        """执行重启操作"""
-        try:
-            self.restart_started.emit()
-            self.logger.info("开始执行PipeWire重启...")
-            
-            if not self._restart_command:
-                self.restart_failed.emit("重启命令未设置")
-                return
-                
-            # 执行重启命令
-            result = subprocess.run(
-                self._restart_command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30  # 30秒超时
-            )
-            
-            if result.returncode == 0:
-                self.logger.info("PipeWire重启成功")
-                self.restart_completed.emit(True, "PipeWire服务重启成功")
-            else:
-                error_msg = f"重启失败，返回码: {result.returncode}, 错误: {result.stderr}"
-                self.logger.error(error_msg)
-                self.restart_failed.emit(error_msg)
-                
-        except subprocess.TimeoutExpired:
-            error_msg = "PipeWire重启超时"
-            self.logger.error(error_msg)
-            self.restart_failed.emit(error_msg)
-            
-        except Exception as e:
-            error_msg = f"PipeWire重启过程中发生异常: {str(e)}"
-            self.logger.error(error_msg, exc_info=True)
-            self.restart_failed.emit(error_msg)
+# systemd用户实例的D-Bus接口
+SYSTEMD_SERVICE = "org.freedesktop.systemd1"
+SYSTEMD_PATH = "/org/freedesktop/systemd1"
+SYSTEMD_MANAGER_INTERFACE = "org.freedesktop.systemd1.Manager"
+SYSTEMD_UNIT_INTERFACE = "org.freedesktop.systemd1.Unit"
+DBUS_PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+PIPEWIRE_UNIT = "pipewire.service"  # 默认检测的systemd用户单元
+DBUS_TIMEOUT_MS = 10000  # 10秒超时
+# 执行用户可配置的重启命令所用的shell，保持对 &&、管道、$VAR、~ 等语法的支持
+RESTART_SHELL = "/bin/sh"
+# 已废弃的配置项：状态和权限检查改为通过D-Bus和PATH完成，不再执行这些命令
+DEPRECATED_CONFIG_KEYS = frozenset({"status_check_command", "permission_check_command"})
 
 
 class PipewireManager(QObject):
@@ -88,8 +48,7 @@ class PipewireManager(QObject):
         # 配置选项
         self.config = {
             "restart_command": "systemctl --user restart pipewire",
-            "status_check_command": "systemctl --user is-active pipewire",
-            "permission_check_command": "systemctl --user list-unit-files pipewire.service",
+            "service_unit": PIPEWIRE_UNIT,  # 通过D-Bus检测状态的systemd用户单元
             "restart_timeout": 30,
             "check_interval": 60  # 秒
         }
@@ -98,42 +57,81 @@ class PipewireManager(QObject):
         self._is_available = False
         self._has_permission = False
         self._last_restart_time = 0
-        self._restart_thread = None
+        self._restart_process = None
+        self._restart_timed_out = False
+        self._availability_checked = False
+        self._permission_checked = False
         
-        # 初始化
-        self._check_service_availability()
-        self._check_user_permissions()
+        # 延迟到事件循环启动后再检查，避免阻塞界面首次绘制
+        QTimer.singleShot(0, self, self._run_deferred_checks)
+    
+    def _run_deferred_checks(self):
+        """执行尚未完成的服务状态和权限检查"""
+        if not self._availability_checked:
+            self._check_service_availability()
+        if not self._permission_checked:
+            self._check_user_permissions()
         
+    def _call_systemd(self, path: str, interface: str, method: str, *args) -> QDBusMessage:
+        """向systemd用户实例发送方法调用
+
+        直接发送方法调用消息，避免创建QDBusInterface时的同步内省往返阻塞界面线程。
+        """
+        message = QDBusMessage.createMethodCall(SYSTEMD_SERVICE, path, interface, method)
+        message.setArguments(list(args))
+        return QDBusConnection.sessionBus().call(
+            message, QDBus.CallMode.Block, DBUS_TIMEOUT_MS
+        )
+    
+    def _get_unit_property(self, unit_path: str, name: str) -> str:
+        """读取systemd单元的属性值"""
+        reply = self._call_systemd(
+            unit_path, DBUS_PROPERTIES_INTERFACE, "Get", SYSTEMD_UNIT_INTERFACE, name
+        )
+        if reply.type() == QDBusMessage.MessageType.ErrorMessage:
+            raise RuntimeError(reply.errorMessage())
+        
+        value = reply.arguments()[0]
+        if hasattr(value, "variant"):
+            value = value.variant()
+        return str(value)
+    
     def _check_service_availability(self):
         """检查PipeWire服务是否可用"""
+        self._availability_checked = True
         try:
             self.logger.info("检查PipeWire服务状态...")
             
+            if not QDBusConnection.sessionBus().isConnected():
+                self._is_available = False
+                status_msg = "无法连接到systemd用户会话总线"
+                self.logger.error(status_msg)
+                self.service_status_changed.emit(False, status_msg)
+                return
+            
             # 检查systemd用户服务是否存在
-            result = subprocess.run(
-                ["systemctl", "--user", "list-unit-files", "pipewire.service"],
-                capture_output=True,
-                text=True,
-                timeout=10
+            reply = self._call_systemd(
+                SYSTEMD_PATH, SYSTEMD_MANAGER_INTERFACE, "LoadUnit", self.config["service_unit"]
             )
+            if reply.type() == QDBusMessage.MessageType.ErrorMessage:
+                unit_path = None
+            else:
+                unit_path = reply.arguments()[0]
+                if hasattr(unit_path, "path"):
+                    unit_path = unit_path.path()
             
-            if result.returncode == 0 and "pipewire.service" in result.stdout:
+            if unit_path and self._get_unit_property(unit_path, "LoadState") == "loaded":
                 # 检查服务状态
-                status_result = subprocess.run(
-                    ["systemctl", "--user", "is-active", "pipewire"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                active_state = self._get_unit_property(unit_path, "ActiveState")
                 
-                if status_result.returncode == 0:
+                if active_state == "active":
                     self._is_available = True
-                    status_msg = f"PipeWire服务正常运行: {status_result.stdout.strip()}"
+                    status_msg = f"PipeWire服务正常运行: {active_state}"
                     self.logger.info(status_msg)
                     self.service_status_changed.emit(True, status_msg)
                 else:
                     self._is_available = False
-                    status_msg = f"PipeWire服务未运行: {status_result.stderr.strip()}"
+                    status_msg = f"PipeWire服务未运行: {active_state}"
                     self.logger.warning(status_msg)
                     self.service_status_changed.emit(False, status_msg)
             else:
@@ -142,11 +140,6 @@ class PipewireManager(QObject):
                 self.logger.error(status_msg)
                 self.service_status_changed.emit(False, status_msg)
                 
-        except subprocess.TimeoutExpired:
-            error_msg = "检查PipeWire服务超时"
-            self.logger.error(error_msg)
-            self.service_status_changed.emit(False, error_msg)
-            
         except Exception as e:
             error_msg = f"检查PipeWire服务时发生异常: {str(e)}"
             self.logger.error(error_msg, exc_info=True)
@@ -154,27 +147,22 @@ class PipewireManager(QObject):
     
     def _check_user_permissions(self):
         """检查用户是否有权限重启PipeWire服务"""
+        self._permission_checked = True
         try:
             self.logger.info("检查PipeWire服务重启权限...")
             
-            # 检查用户是否在正确的用户组中
-            groups_result = subprocess.run(
-                ["groups"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            # 在大多数现代Linux发行版中，用户应该能够管理自己的用户服务，
+            # 只需确认重启命令可执行（通过PATH查找，无需启动子进程）
+            restart_args = shlex.split(self.config["restart_command"])
             
-            if groups_result.returncode == 0:
-                groups = groups_result.stdout.strip().split()
-                # 在大多数现代Linux发行版中，用户应该能够管理自己的用户服务
+            if restart_args and shutil.which(restart_args[0]):
                 self._has_permission = True
                 permission_msg = "用户具有PipeWire服务管理权限"
                 self.logger.info(permission_msg)
                 self.permission_check_completed.emit(True, permission_msg)
             else:
                 self._has_permission = False
-                permission_msg = "无法确定用户权限"
+                permission_msg = "无法确定用户权限: 未找到重启命令"
                 self.logger.warning(permission_msg)
                 self.permission_check_completed.emit(False, permission_msg)
                 
@@ -186,10 +174,14 @@ class PipewireManager(QObject):
     
     def is_service_available(self) -> bool:
         """获取PipeWire服务可用状态"""
+        if not self._availability_checked:
+            self._check_service_availability()
         return self._is_available
     
     def has_restart_permission(self) -> bool:
         """获取重启权限状态"""
+        if not self._permission_checked:
+            self._check_user_permissions()
         return self._has_permission
     
     def get_last_restart_time(self) -> float:
@@ -198,19 +190,20 @@ class PipewireManager(QObject):
     
     def request_restart(self) -> bool:
         """请求重启PipeWire服务"""
-        if not self._is_available:
+        if not self.is_service_available():
             error_msg = "PipeWire服务不可用，无法重启"
             self.logger.error(error_msg)
             self.restart_completed.emit(False, error_msg)
             return False
             
-        if not self._has_permission:
+        if not self.has_restart_permission():
             error_msg = "用户没有PipeWire服务重启权限"
             self.logger.error(error_msg)
             self.restart_completed.emit(False, error_msg)
             return False
             
-        if self._restart_thread and self._restart_thread.isRunning():
+        if (self._restart_process and
+                self._restart_process.state() != QProcess.ProcessState.NotRunning):
             error_msg = "重启操作正在进行中"
             self.logger.warning(error_msg)
             self.restart_completed.emit(False, error_msg)
@@ -220,17 +213,28 @@ class PipewireManager(QObject):
             self.logger.info("启动PipeWire重启流程...")
             self.restart_requested.emit()
             
-            # 创建并启动重启线程
-            self._restart_thread = PipewireRestartThread(self)
-            self._restart_thread.set_restart_command(self.config["restart_command"])
+            # 创建重启进程，由Qt事件循环通知完成，无需额外线程
+            self._restart_timed_out = False
+            self._restart_process = QProcess(self)
+            self._restart_process.setProcessChannelMode(
+                QProcess.ProcessChannelMode.MergedChannels
+            )
             
             # 连接信号
-            self._restart_thread.restart_started.connect(self._on_restart_started)
-            self._restart_thread.restart_completed.connect(self._on_restart_completed)
-            self._restart_thread.restart_failed.connect(self._on_restart_failed)
+            self._restart_process.started.connect(self._on_restart_started)
+            self._restart_process.finished.connect(self._on_restart_process_finished)
+            self._restart_process.errorOccurred.connect(self._on_restart_process_error)
             
-            # 启动线程
-            self._restart_thread.start()
+            # 启动进程并设置超时
+            self.logger.info("开始执行PipeWire重启...")
+            self._restart_process.start(
+                RESTART_SHELL, ["-c", self.config["restart_command"]]
+            )
+            QTimer.singleShot(
+                self.config["restart_timeout"] * 1000,
+                self._restart_process,
+                self._on_restart_timeout
+            )
             
             return True
             
@@ -243,6 +247,33 @@ class PipewireManager(QObject):
     def _on_restart_started(self):
         """重启开始回调"""
         self.logger.info("PipeWire重启操作已开始")
+    
+    def _on_restart_timeout(self):
+        """重启超时回调"""
+        if (self._restart_process and
+                self._restart_process.state() != QProcess.ProcessState.NotRunning):
+            self._restart_timed_out = True
+            self._restart_process.kill()
+    
+    def _on_restart_process_finished(self, exit_code: int, exit_status: QProcess.ExitStatus):
+        """重启进程结束回调"""
+        if self._restart_timed_out:
+            self._on_restart_failed("PipeWire重启超时")
+            return
+        
+        if exit_status == QProcess.ExitStatus.NormalExit and exit_code == 0:
+            self.logger.info("PipeWire重启成功")
+            self._on_restart_completed(True, "PipeWire服务重启成功")
+        else:
+            output = bytes(self._restart_process.readAll()).decode(errors="replace")
+            self._on_restart_failed(f"重启失败，返回码: {exit_code}, 错误: {output}")
+    
+    def _on_restart_process_error(self, error: QProcess.ProcessError):
+        """重启进程错误回调（仅处理无法启动的情况，其余由finished处理）"""
+        if error == QProcess.ProcessError.FailedToStart:
+            self._on_restart_failed(
+                f"PipeWire重启过程中发生异常: {self._restart_process.errorString()}"
+            )
         
     def _on_restart_completed(self, success: bool, message: str):
         """重启完成回调"""
@@ -252,31 +283,32 @@ class PipewireManager(QObject):
             self._last_restart_time = time.time()
             
             # 等待一段时间后重新检查服务状态
-            from PySide6.QtCore import QTimer
             QTimer.singleShot(3000, self._check_service_availability)
         
         self.restart_completed.emit(success, message)
         
-        # 清理线程
-        if self._restart_thread:
-            self._restart_thread.deleteLater()
-            self._restart_thread = None
+        # 清理进程
+        self._release_restart_process()
     
     def _on_restart_failed(self, error_message: str):
         """重启失败回调"""
         self.logger.error(f"PipeWire重启失败: {error_message}")
         self.restart_completed.emit(False, error_message)
         
-        # 清理线程
-        if self._restart_thread:
-            self._restart_thread.deleteLater()
-            self._restart_thread = None
+        # 清理进程
+        self._release_restart_process()
+    
+    def _release_restart_process(self):
+        """释放重启进程对象"""
+        if self._restart_process:
+            self._restart_process.deleteLater()
+            self._restart_process = None
     
     def get_service_info(self) -> Dict[str, Any]:
         """获取PipeWire服务信息"""
         info = {
-            "is_available": self._is_available,
-            "has_permission": self._has_permission,
+            "is_available": self.is_service_available(),
+            "has_permission": self.has_restart_permission(),
             "last_restart_time": self._last_restart_time,
             "last_restart_formatted": self._format_timestamp(self._last_restart_time),
             "restart_command": self.config["restart_command"],
@@ -300,6 +332,15 @@ class PipewireManager(QObject):
         try:
             self.logger.info("更新PipeWire管理器配置...")
             
+            # 忽略已废弃的配置项，兼容旧的调用方和已保存的配置
+            deprecated_keys = DEPRECATED_CONFIG_KEYS.intersection(new_config)
+            if deprecated_keys:
+                self.logger.warning(f"忽略已废弃的配置项: {sorted(deprecated_keys)}")
+                new_config = {
+                    key: value for key, value in new_config.items()
+                    if key not in deprecated_keys
+                }
+            
             # 验证配置项
             valid_keys = set(self.config.keys())
             provided_keys = set(new_config.keys())
@@ -310,13 +351,21 @@ class PipewireManager(QObject):
                 self.logger.error(error_msg)
                 return False
             
+            # 记录检测输入是否发生变化
+            changed_keys = {
+                key for key, value in new_config.items()
+                if self.config.get(key) != value
+            }
+
             # 更新配置
             self.config.update(new_config)
             self.logger.info(f"配置更新成功: {new_config}")
-            
-            # 重新检查权限和服务状态
-            self._check_user_permissions()
-            self._check_service_availability()
+
+            # 仅在检测实际依赖的配置变化时重新检查：权限检查依赖重启命令，状态检查依赖单元名
+            if "restart_command" in changed_keys:
+                self._check_user_permissions()
+            if "service_unit" in changed_keys:
+                self._check_service_availability()
             
             return True
             
@@ -330,10 +379,15 @@ class PipewireManager(QObject):
         try:
             self.logger.info("清理PipeWire管理器资源...")
             
-            # 停止重启线程
-            if self._restart_thread and self._restart_thread.isRunning():
-                self._restart_thread.terminate()
-                self._restart_thread.wait(5000)  # 等待5秒
+            # 停止重启进程
+            if (self._restart_process and
+                    self._restart_process.state() != QProcess.ProcessState.NotRunning):
+                # 先断开结束/错误信号，避免退出时被当作重启失败而发出通知
+                self._restart_process.finished.disconnect(self._on_restart_process_finished)
+                self._restart_process.errorOccurred.disconnect(self._on_restart_process_error)
+                self._restart_process.kill()
+                self._restart_process.waitForFinished(5000)  # 等待5秒
+                self._release_restart_process()
                 
             self.logger.info("PipeWire管理器资源清理完成")
             
@@ -5,10 +5,11 @@ PipeWire管理器集成模块
 提供PipeWire自动重启功能，不包含托盘创建
 """
 
-import os
 import time
+import functools
 from typing import Optional
-from PySide6.QtCore import QObject, Signal, QTimer
+from PySide6.QtCore import Qt, QObject, Signal, QTimer
+from PySide6.QtWebEngineCore import QWebEngineScript
 
 # 导入日志系统
 from logger import get_logger
@@ -18,11 +19,116 @@ from pipewire_manager import get_pipewire_manager
 from profile_manager import get_profile_manager
 
 
+# 主定时器间隔（毫秒），每次触发更新歌曲信息
+TICK_INTERVAL_MS = 3000
+# 每隔多少次触发检查一次PipeWire重启（20 × 3秒 = 1分钟）
+PIPEWIRE_CHECK_TICKS = 20
+# 通知合并窗口（毫秒），窗口内的多条通知合并为一次信号发送
+NOTIFICATION_BATCH_MS = 50
+# 检测到歌曲变化之前，每隔多少次触发才更新一次歌曲信息（3 × 3秒 ≈ 10秒）
+SLOW_SONG_POLL_TICKS = 3
+
+
+# 歌曲信息探测脚本：注入页面后在window上定义songProbe()，每次轮询只需调用该函数
+_SONG_PROBE_JS = """
+(function() {
+    // 多选择器匹配策略：合并为一条复合选择器，每类信息只查询一次DOM
+    var songSelector = [
+        '.song-name',
+        '.current-song',
+        '.music-name',
+        '.title',
+        '[class*="song"]',
+        '[class*="music"]',
+        '[class*="title"]',
+        '.player-song-name',
+        '.song-title',
+        '.music-title'
+    ].join(', ');
+
+    var artistSelector = [
+        '.artist-name',
+        '.artist',
+        '.singer',
+        '[class*="artist"]',
+        '[class*="singer"]',
+        '.player-artist-name'
+    ].join(', ');
+
+    // 返回第一个文本非空的匹配元素的文本
+    function firstText(selector) {
+        var elements = document.querySelectorAll(selector);
+        for (var i = 0; i < elements.length; i++) {
+            var text = (elements[i].textContent || '').trim();
+            if (text) {
+                return text;
+            }
+        }
+        return '';
+    }
+
+    window.songProbe = function() {
+        try {
+            // 尝试获取歌曲名称和艺术家名称
+            var songName = firstText(songSelector);
+            var artistName = firstText(artistSelector);
+
+            // 组合显示信息
+            var displayInfo = '';
+            if (songName && artistName) {
+                displayInfo = songName + ' - ' + artistName;
+            } else if (songName) {
+                displayInfo = songName;
+            } else {
+                displayInfo = '网易云音乐';
+            }
+
+            return {
+                success: true,
+                songName: songName,
+                artistName: artistName,
+                displayInfo: displayInfo,
+                url: window.location.href
+            };
+
+        } catch (e) {
+            return {
+                success: false,
+                error: e.message,
+                displayInfo: '网易云音乐'
+            };
+        }
+    };
+})();
+"""
+
+# 注入脚本的名称，用于在页面脚本集合中查找和替换
+SONG_PROBE_SCRIPT_NAME = "song_probe"
+# 每次轮询执行的调用语句；脚本尚未注入时返回null
+_SONG_PROBE_CALL = "typeof songProbe === 'function' ? songProbe() : null"
+
+
+def _safe(message: str, default=None):
+    """捕获方法中的异常并记录日志（附带堆栈信息），返回默认值"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            except Exception as e:
+                self.logger.error(f"{message}: {e}", exc_info=True)
+                return default
+        return wrapper
+    return decorator
+
+
 class PipeWireManagerIntegration(QObject):
     """PipeWire管理器集成类 - 专注于PipeWire功能，不创建托盘"""
     
     # 信号定义
     restart_notification_requested = Signal(str, bool)  # message, is_error
+    # 内部信号：歌曲信息脚本结果经事件队列转交处理，避免在runJavaScript回调中直接执行
+    _song_info_ready = Signal(dict)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -30,317 +136,282 @@ class PipeWireManagerIntegration(QObject):
         self.logger.info("正在初始化PipeWire管理器集成...")
         
         # PipeWire相关属性
-        self.pipewire_timer = None
+        self._main_timer = None
+        self._tick = 0
+        self._fast_song_polling = False  # 检测到歌曲变化后切换为每次触发都更新
         self.pipewire_manager = None
         self.profile_manager = None
         self.last_song_change_time = 0
         self.is_song_paused = False
         self.user_idle_time = 0
-        self.last_user_activity = time.time()
+        self.last_user_activity = time.monotonic()  # 单调时钟，仅用于间隔判断
+        
+        # 待发送的通知（message, is_error），由单次定时器统一发送
+        self._pending_notifications = []
+        self._notification_timer = QTimer(self)
+        self._notification_timer.setSingleShot(True)
+        self._notification_timer.setInterval(NOTIFICATION_BATCH_MS)
+        self._notification_timer.timeout.connect(self._flush_notifications)
+        
+        self._song_info_ready.connect(
+            self._on_song_info_result, Qt.ConnectionType.QueuedConnection
+        )
         
         # WebView引用（用于获取歌曲信息）
         self.web_view = None
+        self._web_page = None
+        self.current_song_info = ""
         
         # 初始化PipeWire管理器
         self._init_pipewire_manager()
         
         self.logger.info("PipeWire管理器集成初始化完成")
     
+    @_safe("初始化PipeWire管理器失败")
     def _init_pipewire_manager(self):
         """初始化PipeWire管理器"""
-        try:
-            self.pipewire_manager = get_pipewire_manager()
-            self.profile_manager = get_profile_manager()
-            
-            # 连接PipeWire信号
-            self.pipewire_manager.restart_completed.connect(self._on_pipewire_restart_completed)
-            self.pipewire_manager.service_status_changed.connect(self._on_pipewire_status_changed)
-            
-            # 启动PipeWire检查定时器
-            self._start_pipewire_timer()
-            
-            self.logger.info("PipeWire管理器初始化完成")
-            
-        except Exception as e:
-            self.logger.error(f"初始化PipeWire管理器失败: {e}", exc_info=True)
+        self.pipewire_manager = get_pipewire_manager()
+        self.profile_manager = get_profile_manager()
+        
+        # 连接PipeWire信号
+        self.pipewire_manager.restart_completed.connect(self._on_pipewire_restart_completed)
+        self.pipewire_manager.service_status_changed.connect(self._on_pipewire_status_changed)
+        
+        # 启动主定时器（同时负责歌曲信息更新和PipeWire检查）
+        self._start_main_timer()
+        
+        self.logger.info("PipeWire管理器初始化完成")
     
-    def _start_pipewire_timer(self):
-        """启动PipeWire检查定时器"""
-        try:
-            if self.pipewire_timer:
-                self.pipewire_timer.stop()
-            
-            self.pipewire_timer = QTimer()
-            self.pipewire_timer.timeout.connect(self._check_pipewire_restart)
-            self.pipewire_timer.start(60000)  # 每分钟检查一次
-            
-            self.logger.debug("PipeWire检查定时器已启动")
-            
-        except Exception as e:
-            self.logger.error(f"启动PipeWire检查定时器失败: {e}", exc_info=True)
+    @_safe("启动主定时器失败")
+    def _start_main_timer(self):
+        """启动主定时器，合并歌曲信息更新和PipeWire检查以减少唤醒次数"""
+        if self._main_timer:
+            # 断开旧定时器的连接并释放，避免其继续持有回调
+            self._main_timer.stop()
+            self._main_timer.timeout.disconnect()
+            self._main_timer.deleteLater()
+        
+        self._tick = 0
+        self._main_timer = QTimer()
+        self._main_timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self._main_timer.timeout.connect(self._on_tick)
+        self._main_timer.start(TICK_INTERVAL_MS)
+        
+        self.logger.debug("主定时器已启动")
     
+    def _on_tick(self):
+        """主定时器回调：按需更新歌曲信息，每分钟检查一次PipeWire重启"""
+        self._tick += 1
+        # 暂停播放时歌曲信息不会变化，跳过轮询；未检测到歌曲变化前降低轮询频率
+        if not self.is_song_paused and (
+                self._fast_song_polling or self._tick % SLOW_SONG_POLL_TICKS == 0):
+            self._update_song_info()
+        if self._tick % PIPEWIRE_CHECK_TICKS == 0:
+            self._check_pipewire_restart()
+    
+    @_safe("检查PipeWire重启失败")
     def _check_pipewire_restart(self):
         """检查是否需要执行PipeWire重启"""
-        try:
-            # 检查管理器是否可用
-            if not self.profile_manager or not self.pipewire_manager:
-                return
-            
-            # 检查自动重启是否启用
-            if not self.profile_manager.is_pipewire_auto_restart_enabled():
-                return
-            
-            # 检查是否应该跳过下次重启
-            if self.profile_manager.should_skip_pipewire_restart():
-                return
-            
-            # 检查是否到了重启时间
-            if not self.profile_manager.is_pipewire_restart_due():
-                return
-            
-            # 检查是否是合适的重启时机
-            if self._is_good_restart_time():
-                self._execute_pipewire_restart()
-            else:
-                self.logger.debug("当前不是PipeWire重启的合适时机")
-                
-        except Exception as e:
-            self.logger.error(f"检查PipeWire重启失败: {e}", exc_info=True)
+        # 检查管理器是否可用
+        if not self.profile_manager or not self.pipewire_manager:
+            return
+        
+        # 一次读取配置，后续判断均基于同一份快照
+        config = self.profile_manager.load_pipewire_config()
+        
+        # 检查自动重启是否启用
+        if not config.get("auto_restart_enabled", True):
+            return
+        
+        # 检查是否应该跳过下次重启
+        if config.get("skip_next_restart", False):
+            return
+        
+        # 检查是否到了重启时间
+        current_time = time.time()
+        next_restart_time = config.get("next_restart_timestamp", 0.0)
+        if not (next_restart_time > 0 and current_time >= next_restart_time):
+            return
+        self.logger.info(f"PipeWire重启时间已到: 当前={current_time}, 计划={next_restart_time}")
+        
+        # 检查是否是合适的重启时机
+        if self._is_good_restart_time(next_restart_time):
+            self._execute_pipewire_restart()
+        else:
+            self.logger.debug("当前不是PipeWire重启的合适时机")
     
-    def _is_good_restart_time(self) -> bool:
+    @_safe("判断重启时机失败", default=False)
+    def _is_good_restart_time(self, next_restart_time: float) -> bool:
         """判断是否是合适的重启时机"""
-        try:
-            # 检查管理器是否可用
-            if not self.profile_manager:
-                return False
-            
-            # 优先级1: 用户暂停播放时
-            if self.is_song_paused:
-                self.logger.debug("检测到播放暂停，这是重启的好时机")
-                return True
-            
-            # 优先级2: 歌曲切换间隙（最近5秒内有歌曲变化）
-            current_time = time.time()
-            if (self.last_song_change_time > 0 and 
-                current_time - self.last_song_change_time <= 5):
-                self.logger.debug("检测到歌曲切换间隙，这是重启的好时机")
-                return True
-            
-            # 优先级3: 用户空闲时间超过30秒
-            if current_time - self.last_user_activity >= 30:
-                self.logger.debug("检测到用户空闲，这是重启的好时机")
-                return True
-            
-            # 优先级4: 如果重启时间已过期超过5分钟，强制重启
-            next_restart_time = self.profile_manager.get_pipewire_next_restart_time()
-            if (next_restart_time > 0 and 
-                current_time - next_restart_time >= 300):
-                self.logger.warning("重启时间已过期超过5分钟，强制执行重启")
-                return True
-            
-            self.logger.debug("当前不是重启的好时机")
-            return False
-            
-        except Exception as e:
-            self.logger.error(f"判断重启时机失败: {e}", exc_info=True)
-            return False
+        # 调用方已确认管理器可用；先读取到局部变量，按代价从低到高依次判断
+        last_song_change_time = self.last_song_change_time
+        last_user_activity = self.last_user_activity
+        now = time.monotonic()
+        
+        # 优先级1: 用户暂停播放时
+        if self.is_song_paused:
+            self.logger.debug("检测到播放暂停，这是重启的好时机")
+            return True
+        
+        # 优先级2: 歌曲切换间隙（最近5秒内有歌曲变化）
+        if last_song_change_time > 0 and now - last_song_change_time <= 5:
+            self.logger.debug("检测到歌曲切换间隙，这是重启的好时机")
+            return True
+        
+        # 优先级3: 用户空闲时间超过30秒
+        if now - last_user_activity >= 30:
+            self.logger.debug("检测到用户空闲，这是重启的好时机")
+            return True
+        
+        # 优先级4: 如果重启时间已过期超过5分钟，强制重启（配置中保存的是墙上时钟时间戳）
+        if next_restart_time > 0 and time.time() - next_restart_time >= 300:
+            self.logger.warning("重启时间已过期超过5分钟，强制执行重启")
+            return True
+        
+        self.logger.debug("当前不是重启的好时机")
+        return False
     
+    @_safe("执行PipeWire重启失败")
     def _execute_pipewire_restart(self):
         """执行PipeWire重启"""
-        try:
-            # 检查管理器是否可用
-            if not self.profile_manager or not self.pipewire_manager:
-                return
-                
-            self.logger.info("开始执行PipeWire自动重启...")
-            
-            # 发送通知信号
-            if self.profile_manager.get_pipewire_full_config().get("show_notifications", True):
-                self.restart_notification_requested.emit("正在重启PipeWire音频服务...", False)
+        # 检查管理器是否可用
+        if not self.profile_manager or not self.pipewire_manager:
+            return
             
-            # 请求重启
-            success = self.pipewire_manager.request_restart()
-            
-            if not success:
-                self.logger.error("PipeWire重启请求失败")
-                self.restart_notification_requested.emit("PipeWire重启失败", True)
-            else:
-                self.logger.info("PipeWire重启请求已发送")
-                
-        except Exception as e:
-            self.logger.error(f"执行PipeWire重启失败: {e}", exc_info=True)
+        self.logger.info("开始执行PipeWire自动重启...")
+        show_notifications = self.profile_manager.is_show_notifications_enabled()
+        
+        # 发送通知信号
+        if show_notifications:
+            self._queue_notification("正在重启PipeWire音频服务...", False)
+        
+        # 请求重启
+        success = self.pipewire_manager.request_restart()
+        
+        if not success:
+            self.logger.error("PipeWire重启请求失败")
+            self._queue_notification("PipeWire重启失败", True)
+        else:
+            self.logger.info("PipeWire重启请求已发送")
     
+    @_safe("处理PipeWire重启完成回调失败")
     def _on_pipewire_restart_completed(self, success: bool, message: str):
         """PipeWire重启完成回调"""
-        try:
-            # 检查管理器是否可用
-            if not self.profile_manager:
-                return
-                
-            if success:
-                self.logger.info(f"PipeWire自动重启成功: {message}")
-                
-                # 更新重启时间
-                current_time = time.time()
-                self.profile_manager.update_pipewire_restart_time(current_time)
-                
-                # 发送成功通知信号
-                if self.profile_manager.get_pipewire_full_config().get("show_notifications", True):
-                    self.restart_notification_requested.emit("PipeWire音频服务重启成功", False)
-                    
-            else:
-                self.logger.error(f"PipeWire自动重启失败: {message}")
+        # 检查管理器是否可用
+        if not self.profile_manager:
+            return
+            
+        if success:
+            self.logger.info(f"PipeWire自动重启成功: {message}")
+            
+            # 更新重启时间
+            current_time = time.time()
+            self.profile_manager.update_pipewire_restart_time(current_time)
+            
+            # 发送成功通知信号
+            if self.profile_manager.is_show_notifications_enabled():
+                self._queue_notification("PipeWire音频服务重启成功", False)
                 
-                # 发送失败通知信号
-                if self.profile_manager.get_pipewire_full_config().get("show_notifications", True):
-                    self.restart_notification_requested.emit(f"PipeWire重启失败: {message}", True)
-                    
-        except Exception as e:
-            self.logger.error(f"处理PipeWire重启完成回调失败: {e}", exc_info=True)
+        else:
+            self.logger.error(f"PipeWire自动重启失败: {message}")
+            
+            # 发送失败通知信号
+            if self.profile_manager.is_show_notifications_enabled():
+                self._queue_notification(f"PipeWire重启失败: {message}", True)
     
+    def _queue_notification(self, message: str, is_error: bool = False):
+        """将通知加入待发送队列，并在合并窗口结束后统一发送"""
+        self._pending_notifications.append((message, is_error))
+        if not self._notification_timer.isActive():
+            self._notification_timer.start()
+    
+    def _flush_notifications(self):
+        """合并发送队列中的所有通知"""
+        if not self._pending_notifications:
+            return
+        
+        pending = self._pending_notifications
+        self._pending_notifications = []
+        self.restart_notification_requested.emit(
+            "\n".join(message for message, _ in pending),
+            any(is_error for _, is_error in pending)
+        )
+    
+    @_safe("处理PipeWire状态变化失败")
     def _on_pipewire_status_changed(self, is_available: bool, message: str):
         """PipeWire状态变化回调"""
-        try:
-            if is_available:
-                self.logger.info(f"PipeWire服务状态: {message}")
-            else:
-                self.logger.warning(f"PipeWire服务状态异常: {message}")
-                
-        except Exception as e:
-            self.logger.error(f"处理PipeWire状态变化失败: {e}", exc_info=True)
+        if is_available:
+            self.logger.info(f"PipeWire服务状态: {message}")
+        else:
+            self.logger.warning(f"PipeWire服务状态异常: {message}")
     
     def set_webview(self, web_view):
         """设置WebView实例用于获取歌曲信息"""
         self.web_view = web_view
-        self.logger.debug("WebView实例已设置")
-        
-        # 启动歌曲信息监控
-        if self.web_view:
-            self._start_song_monitoring()
+        # 缓存页面对象，避免每次轮询都重新获取
+        self._web_page = web_view.page() if web_view else None
+        if self._web_page:
+            self._install_song_probe()
+        self.logger.debug("WebView实例已设置，歌曲信息由主定时器更新")
     
-    def _start_song_monitoring(self):
-        """启动歌曲信息监控"""
-        try:
-            # 创建歌曲信息更新定时器
-            self.song_update_timer = QTimer()
-            self.song_update_timer.timeout.connect(self._update_song_info)
-            self.song_update_timer.start(3000)  # 每3秒更新一次
-            
-            self.logger.debug("歌曲信息监控已启动")
-            
-        except Exception as e:
-            self.logger.error(f"启动歌曲信息监控失败: {e}", exc_info=True)
+    @_safe("注入歌曲信息探测脚本失败")
+    def _install_song_probe(self):
+        """将歌曲信息探测脚本注册为页面脚本，页面每次加载后自动注入"""
+        scripts = self._web_page.scripts()
+        for old_script in scripts.find(SONG_PROBE_SCRIPT_NAME):
+            scripts.remove(old_script)
+        
+        script = QWebEngineScript()
+        script.setName(SONG_PROBE_SCRIPT_NAME)
+        script.setSourceCode(_SONG_PROBE_JS)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.ApplicationWorld)
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
+        script.setRunsOnSubFrames(False)
+        scripts.insert(script)
+        
+        # 当前页面可能已经加载完成，立即定义一次探测函数
+        self._web_page.runJavaScript(
+            _SONG_PROBE_JS, QWebEngineScript.ScriptWorldId.ApplicationWorld
+        )
     
+    @_safe("更新歌曲信息失败")
     def _update_song_info(self):
         """更新歌曲信息"""
-        try:
-            if not self.web_view:
-                return
-            
-            # JavaScript代码提取歌曲信息
-            js_code = """
-            (function() {
-                try {
-                    // 多选择器匹配策略
-                    var selectors = [
-                        '.song-name',
-                        '.current-song', 
-                        '.music-name',
-                        '.title',
-                        '[class*="song"]',
-                        '[class*="music"]',
-                        '[class*="title"]',
-                        '.player-song-name',
-                        '.song-title',
-                        '.music-title'
-                    ];
-                    
-                    var songName = '';
-                    var artistName = '';
-                    
-                    // 尝试获取歌曲名称
-                    for (var i = 0; i < selectors.length; i++) {
-                        var element = document.querySelector(selectors[i]);
-                        if (element && element.textContent && element.textContent.trim()) {
-                            songName = element.textContent.trim();
-                            break;
-                        }
-                    }
-                    
-                    // 尝试获取艺术家名称
-                    var artistSelectors = [
-                        '.artist-name',
-                        '.artist',
-                        '.singer',
-                        '[class*="artist"]',
-                        '[class*="singer"]',
-                        '.player-artist-name'
-                    ];
-                    
-                    for (var i = 0; i < artistSelectors.length; i++) {
-                        var element = document.querySelector(artistSelectors[i]);
-                        if (element && element.textContent && element.textContent.trim()) {
-                            artistName = element.textContent.trim();
-                            break;
-                        }
-                    }
-                    
-                    // 组合显示信息
-                    var displayInfo = '';
-                    if (songName && artistName) {
-                        displayInfo = songName + ' - ' + artistName;
-                    } else if (songName) {
-                        displayInfo = songName;
-                    } else {
-                        displayInfo = '网易云音乐';
-                    }
-                    
-                    return {
-                        success: true,
-                        songName: songName,
-                        artistName: artistName,
-                        displayInfo: displayInfo,
-                        url: window.location.href
-                    };
-                    
-                } catch (e) {
-                    return {
-                        success: false,
-                        error: e.message,
-                        displayInfo: '网易云音乐'
-                    };
-                }
-            })();
-            """
-            
-            self.web_view.page().runJavaScript(js_code, self._on_song_info_result)
-            
-        except Exception as e:
-            self.logger.error(f"更新歌曲信息失败: {e}", exc_info=True)
+        if not self._web_page:
+            return
+        
+        self._web_page.runJavaScript(
+            _SONG_PROBE_CALL,
+            QWebEngineScript.ScriptWorldId.ApplicationWorld,
+            lambda result: self._song_info_ready.emit(result or {})
+        )
     
+    @_safe("处理歌曲信息结果失败")
     def _on_song_info_result(self, result):
         """处理歌曲信息提取结果"""
-        try:
-            if result and isinstance(result, dict):
-                if result.get("success"):
-                    new_info = result.get("displayInfo", "网易云音乐")
-                    if new_info != self.current_song_info:
-                        self.current_song_info = new_info
-                        self.on_song_changed()  # 通知歌曲变化
-                        self.logger.info(f"歌曲信息更新: {self.current_song_info}")
-                else:
-                    self.logger.debug(f"歌曲信息提取失败: {result.get('error', '未知错误')}")
-                    
-        except Exception as e:
-            self.logger.error(f"处理歌曲信息结果失败: {e}", exc_info=True)
+        # 脚本返回对象字面量，Qt会将其转换为dict
+        if not result:
+            return
+        
+        if result.get("success"):
+            new_info = result.get("displayInfo", "网易云音乐")
+            if new_info != self.current_song_info:
+                self.current_song_info = new_info
+                # 仅在页面上确实有歌曲时才视为歌曲变化；占位文本不应触发快速轮询
+                if result.get("songName"):
+                    self.on_song_changed()  # 通知歌曲变化
+                self.logger.info(f"歌曲信息更新: {self.current_song_info}")
+        else:
+            self.logger.debug(f"歌曲信息提取失败: {result.get('error', '未知错误')}")
     
     def update_user_activity(self):
         """更新用户活动时间"""
-        self.last_user_activity = time.time()
+        self.last_user_activity = time.monotonic()
     
     def on_song_changed(self):
         """歌曲变化回调"""
-        self.last_song_change_time = time.time()
+        self.last_song_change_time = time.monotonic()
+        self._fast_song_polling = True
         self.logger.debug("检测到歌曲变化")
     
     def on_playback_paused(self):
@@ -352,33 +423,30 @@ class PipeWireManagerIntegration(QObject):
         """播放恢复回调"""
         self.is_song_paused = False
         self.logger.debug("检测到播放恢复")
+        
+        # 恢复播放后立即刷新一次歌曲信息
+        self._update_song_info()
     
+    @_safe("获取重启倒计时失败", default="未知")
     def get_next_restart_countdown(self) -> str:
         """获取下次重启倒计时"""
-        try:
-            if not self.profile_manager:
-                return "未知"
-            config = self.profile_manager.get_pipewire_full_config()
-            return config.get("next_restart_countdown", "未设置")
-        except Exception as e:
-            self.logger.error(f"获取重启倒计时失败: {e}")
+        if not self.profile_manager:
             return "未知"
+        config = self.profile_manager.get_pipewire_full_config()
+        return config.get("next_restart_countdown", "未设置")
     
+    @_safe("清理PipeWire管理器集成资源失败")
     def cleanup(self):
         """清理资源"""
-        try:
-            self.logger.info("正在清理PipeWire管理器集成资源...")
-            
-            # 停止定时器
-            if hasattr(self, 'song_update_timer') and self.song_update_timer:
-                self.song_update_timer.stop()
-                self.song_update_timer = None
-            
-            if self.pipewire_timer:
-                self.pipewire_timer.stop()
-                self.pipewire_timer = None
-            
-            self.logger.info("PipeWire管理器集成资源清理完成")
-            
-        except Exception as e:
-            self.logger.error(f"清理PipeWire管理器集成资源失败: {e}", exc_info=True)
+        self.logger.info("正在清理PipeWire管理器集成资源...")
+        
+        # 发送尚未发出的通知
+        self._notification_timer.stop()
+        self._flush_notifications()
+        
+        # 停止定时器
+        if self._main_timer:
+            self._main_timer.stop()
+            self._main_timer = None
+        
+        self.logger.info("PipeWire管理器集成资源清理完成")
@@ -6,22 +6,206 @@ WebEngine Profile管理器
 """
 
 import os
-import sys
 import time
+import copy
 import json
-import base64
+import datetime
+import functools
+import fcntl
+import shutil
+import stat
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 
+from PySide6.QtCore import QCoreApplication, QTimer
 from PySide6.QtWebEngineCore import QWebEngineProfile
 from PySide6.QtWidgets import QApplication
 
 from logger import get_logger
 
+# orjson为可选依赖，未安装时回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_json(data: Any) -> bytes:
+    """将数据序列化为紧凑的UTF-8 JSON字节串（配置文件只由程序读写，无需缩进）"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _loads_json(data: bytes) -> Any:
+    """从UTF-8 JSON字节串反序列化数据"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _content_hash(data: Dict[str, Any]) -> int:
+    """计算配置内容的哈希值，忽略每次保存都会变化的last_updated字段"""
+    return hash(_dumps_json({k: v for k, v in data.items() if k != "last_updated"}))
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """获取普通文件的 (大小, 修改时间纳秒)，不存在或不是普通文件时返回None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_size, st.st_mtime_ns) if stat.S_ISREG(st.st_mode) else None
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    """获取文件修改时间（纳秒），文件不存在时返回None"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@functools.lru_cache(maxsize=16)
+def _format_timestamp(timestamp: float) -> str:
+    """将时间戳格式化为本地时间字符串，结果按时间戳缓存"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+
+def _now_str() -> str:
+    """返回当前本地时间字符串，格式为 YYYY-MM-DD HH:MM:SS"""
+    return datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+
+
+def _write_and_sync(fd: int, data: bytes):
+    """通过文件描述符写入全部数据并刷入磁盘，不经过Python的文件缓冲"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+    os.fsync(fd)
+
+
+def _fsync_directory(directory: str):
+    """刷新目录项，确保重命名在崩溃后依然生效"""
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _atomic_write_bytes(path: str, data: bytes):
+    """原子写入文件，写入过程中崩溃不会留下内容不完整的文件
+
+    先写入临时文件并刷入磁盘，再重命名替换目标文件，最后刷新目录项。
+    """
+    directory = os.path.dirname(path)
+    temp_path = path + ".tmp"
+    
+    try:
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            _write_and_sync(fd, data)
+        finally:
+            os.close(fd)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    
+    _fsync_directory(directory)
+
+
+def _fast_rmtree(path: str):
+    """递归删除目录树，仅用于应用自身管理的目录
+
+    依赖scandir返回的文件类型判断是否为目录（符号链接不会被跟随），
+    不像shutil.rmtree那样对每个子目录额外做安全性stat检查。
+    与shutil.rmtree一样拒绝删除符号链接形式的根目录，避免清空链接目标。
+    """
+    if os.path.islink(path):
+        raise OSError(f"拒绝删除符号链接目录: {path}")
+    
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _fast_rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
+
+# Linux FICLONE ioctl编号，用于在Btrfs/XFS等文件系统上创建写时复制的文件副本
+FICLONE = 0x40049409
+
+
+def _clone_file(src: str, dst: str) -> str:
+    """复制单个文件，优先使用reflink克隆，不支持时回退到普通数据复制
+
+    作为shutil.copytree的copy_function使用，会保留源文件的权限位
+    （Cookies等SQLite文件为0600，副本不能变成其他用户可读）。
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        # 写入数据前先收紧权限；对已打开的描述符修改权限不影响后续写入
+        os.fchmod(fdst.fileno(), os.fstat(fsrc.fileno()).st_mode & 0o7777)
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            # 文件系统不支持reflink（或跨文件系统）时通过已打开的描述符复制，
+            # 不能重新打开dst：源文件只读时dst已是只读权限，再次打开会失败
+            shutil.copyfileobj(fsrc, fdst)
+    return dst
+
+
+# 关键登录文件 - 现代WebKit数据结构简化验证，Cookies是唯一关键的登录凭证
+CRITICAL_LOGIN_FILES = frozenset({"Cookies"})
+# SQLite的辅助文件通常为空或很小，不视为异常
+SQLITE_AUX_SUFFIXES = ("-journal", "-wal", "-shm")
+# 小于该字节数的非辅助文件被视为可能损坏
+TINY_FILE_THRESHOLD = 10
+
+# WebEngine HTTP磁盘缓存上限（字节）
+HTTP_CACHE_MAX_SIZE = 200 * 1024 * 1024
+
+# 设置类方法的写入合并窗口（毫秒），窗口内的多次修改只写入一次磁盘
+SAVE_DEBOUNCE_MS = 500
+
+# 目录扫描快照的有效期（秒），短时间内连续调用的验证/统计/清理共享同一次扫描
+SCAN_CACHE_MAX_AGE = 0.5
+
 
 class ProfileManager:
     """WebEngine Profile管理器，确保登录数据正确持久化"""
     
+    # 实例属性在初始化时全部确定，使用__slots__减少内存占用并加快属性访问
+    __slots__ = (
+        "logger",
+        "storage_path",
+        "profile",
+        "_window_settings_path",
+        "_window_geometry_path",
+        "_user_preferences_path",
+        "_pipewire_config_path",
+        "_pw_cache",
+        "_pw_mtime",
+        "_next_restart_ts",
+        "_scan_cache",
+        "_scan_time",
+        "_prefs_hash",
+        "_prefs",
+        "_prefs_mtime",
+        "_saved_geometry",
+        "_storage_verified",
+        "_login_check_key",
+        "_login_check_result",
+        "_pw_pending",
+        "_prefs_dirty",
+        "_flush_scheduled",
+    )
+    
     def __init__(self, storage_path: Optional[str] = None):
         self.logger = get_logger("profile_manager")
         
@@ -32,20 +216,47 @@ class ProfileManager:
                 storage_path = os.path.expanduser("~/.local/share/netease-music/login_data")
         
         self.storage_path = os.path.abspath(storage_path)
+        # storage_path构造后不再变化，预先拼接常用的设置文件路径
+        self._window_settings_path = os.path.join(self.storage_path, "window_settings.json")
+        self._window_geometry_path = os.path.join(self.storage_path, "window_geometry.bin")
+        self._user_preferences_path = os.path.join(self.storage_path, "user_preferences.json")
+        self._pipewire_config_path = os.path.join(self.storage_path, "pipewire_config.json")
         self.profile: Optional[QWebEngineProfile] = None
+        # PipeWire配置的内存缓存及对应的文件修改时间（纳秒），文件未变化时不再重复解析
+        self._pw_cache: Optional[Dict[str, Any]] = None
+        self._pw_mtime: Optional[int] = None
+        self._next_restart_ts: Optional[float] = None  # 下次重启时间戳缓存，由读取和保存配置时维护
+        # 存储目录扫描快照 [(文件名, 大小, 修改时间)] 及其monotonic时间
+        self._scan_cache: Optional[List[Tuple[str, int, float]]] = None
+        self._scan_time = 0.0
+        # 最近一次写入/读取的磁盘内容，用于跳过内容未变化的重复写入
+        self._prefs_hash: Optional[int] = None
+        self._prefs: Optional[Dict[str, Any]] = None  # 用户偏好设置的内存缓存，首次加载时填充
+        self._prefs_mtime: Optional[int] = None  # 缓存对应的文件修改时间（纳秒），文件不存在时为None
+        self._saved_geometry: Optional[tuple] = None  # (几何数据, 是否最大化)
+        self._storage_verified = False  # 存储目录检查通过后不再重复检查
+        # 延迟写入：待保存的PipeWire配置、偏好设置是否有未保存修改、是否已安排写入
+        self._pw_pending: Optional[Dict[str, Any]] = None
+        self._prefs_dirty = False
+        self._flush_scheduled = False
+        # 上次登录数据验证时的缓存键（目录修改时间, 关键文件签名）及验证结果
+        self._login_check_key: Optional[tuple] = None
+        self._login_check_result = False
         self._ensure_storage_directory()
         
     def _ensure_storage_directory(self):
-        """确保存储目录存在且可写"""
+        """确保存储目录存在且可写（检查通过后直接返回）"""
+        if self._storage_verified:
+            return True
+        
         try:
             os.makedirs(self.storage_path, exist_ok=True)
             
-            # 测试目录权限
-            test_file = os.path.join(self.storage_path, ".permission_test")
-            with open(test_file, 'w') as f:
-                f.write("test")
-            os.remove(test_file)
+            # 测试目录权限（写入和进入目录），无需创建测试文件
+            if not os.access(self.storage_path, os.W_OK | os.X_OK):
+                raise PermissionError(f"存储目录不可写: {self.storage_path}")
             
+            self._storage_verified = True
             self.logger.info(f"存储目录准备就绪: {self.storage_path}")
             return True
             
@@ -56,6 +267,17 @@ class ProfileManager:
     def create_persistent_profile(self, profile_name: str = "NetEaseMusic") -> QWebEngineProfile:
         """创建持久化Profile"""
         try:
+            # 已创建且配置一致的Profile直接复用，避免Chromium重新初始化Cookie库和磁盘缓存
+            if (
+                self.profile is not None
+                and self.profile.storageName() == profile_name
+                and self.profile.persistentStoragePath() == self.storage_path
+                and self.profile.persistentCookiesPolicy()
+                == QWebEngineProfile.PersistentCookiesPolicy.ForcePersistentCookies
+            ):
+                self.logger.debug("复用已创建的持久化Profile")
+                return self.profile
+            
             self.logger.info("开始创建持久化Profile...")
             
             # 确保QApplication存在
@@ -67,17 +289,21 @@ class ProfileManager:
             
             # 强制设置持久化存储路径
             self.profile.setPersistentStoragePath(self.storage_path)
-            self.logger.info(f"设置持久化存储路径: {self.storage_path}")
+            self.logger.debug("设置持久化存储路径: %s", self.storage_path)
             
             # 使用强制持久化Cookie策略（关键修复）
             self.profile.setPersistentCookiesPolicy(
                 QWebEngineProfile.PersistentCookiesPolicy.ForcePersistentCookies
             )
-            self.logger.info("设置Cookie策略为强制持久化")
+            self.logger.debug("设置Cookie策略为强制持久化")
             
             # 设置HTTP缓存为磁盘缓存（避免内存缓存导致数据丢失）
             self.profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
-            self.logger.info("设置HTTP缓存为磁盘缓存")
+            self.logger.debug("设置HTTP缓存为磁盘缓存")
+            
+            # 限制磁盘缓存大小；缓存默认位于XDG缓存目录，不在持久化存储路径下，备份时不会包含
+            self.profile.setHttpCacheMaximumSize(HTTP_CACHE_MAX_SIZE)
+            self.logger.debug("HTTP缓存目录: %s", self.profile.cachePath())
             
             # 设置其他相关配置
             self._configure_profile_settings()
@@ -126,10 +352,11 @@ class ProfileManager:
             cookie_policy = self.profile.persistentCookiesPolicy()
             cache_type = self.profile.httpCacheType()
             
-            self.logger.info("=== Profile配置验证 ===")
-            self.logger.info(f"存储路径: {storage_path}")
-            self.logger.info(f"Cookie策略: {cookie_policy}")
-            self.logger.info(f"缓存类型: {cache_type}")
+            # 配置详情仅用于调试，日志参数延迟格式化
+            self.logger.debug("=== Profile配置验证 ===")
+            self.logger.debug("存储路径: %s", storage_path)
+            self.logger.debug("Cookie策略: %s", cookie_policy)
+            self.logger.debug("缓存类型: %s", cache_type)
             
             # 验证关键设置
             if storage_path != self.storage_path:
@@ -144,6 +371,30 @@ class ProfileManager:
         except Exception as e:
             self.logger.error(f"验证Profile配置失败: {e}")
     
+    def _iter_files(self) -> Iterator[os.DirEntry]:
+        """惰性遍历存储目录中的普通文件，不获取文件状态"""
+        # scandir在遍历时即带回文件类型，无需额外stat
+        with os.scandir(self.storage_path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    yield entry
+    
+    def _scan_files(self) -> Iterator[Tuple[str, int, float]]:
+        """遍历存储目录中的普通文件，逐个产出 (文件名, 大小, 修改时间)"""
+        for entry in self._iter_files():
+            stat = entry.stat(follow_symlinks=False)
+            yield entry.name, stat.st_size, stat.st_mtime
+    
+    def _scan_storage(self, max_age: float = SCAN_CACHE_MAX_AGE) -> List[Tuple[str, int, float]]:
+        """获取存储目录的扫描快照，max_age秒内的重复调用直接复用上次结果"""
+        now = time.monotonic()
+        if self._scan_cache is not None and now - self._scan_time < max_age:
+            return self._scan_cache
+        
+        self._scan_cache = list(self._scan_files())
+        self._scan_time = now
+        return self._scan_cache
+    
     def get_login_data_info(self) -> Dict[str, Any]:
         """获取登录数据信息"""
         try:
@@ -153,18 +404,14 @@ class ProfileManager:
             files = []
             total_size = 0
             
-            for item in os.listdir(self.storage_path):
-                item_path = os.path.join(self.storage_path, item)
-                if os.path.isfile(item_path):
-                    size = os.path.getsize(item_path)
-                    mtime = os.path.getmtime(item_path)
-                    files.append({
-                        "name": item,
-                        "path": item_path,
-                        "size": size,
-                        "modified": mtime
-                    })
-                    total_size += size
+            for name, size, mtime in self._scan_storage():
+                files.append({
+                    "name": name,
+                    "path": os.path.join(self.storage_path, name),
+                    "size": size,
+                    "modified": mtime
+                })
+                total_size += size
             
             return {
                 "status": "has_data" if files else "empty",
@@ -179,48 +426,54 @@ class ProfileManager:
             return {"status": "error", "error": str(e)}
     
     def validate_login_data(self) -> bool:
-        """验证登录数据是否有效"""
+        """验证登录数据是否有效（目录内容未变化时沿用上次结果）"""
         try:
-            data_info = self.get_login_data_info()
-            
-            if data_info["status"] == "no_data":
+            mtime = _mtime_ns(self.storage_path)
+            if mtime is None:
                 self.logger.warning("登录数据目录不存在")
                 return False
             
-            if data_info["status"] == "empty":
-                self.logger.warning("登录数据目录为空")
-                return False
-            
-            # 检查关键文件 - 现代WebKit数据结构简化验证
             # 只检查真正关键的登录文件，其他都是可选的
-            critical_files = ["Cookies"]  # Cookies是唯一关键的登录凭证
-            existing_files = [f["name"] for f in data_info["files"]]
+            critical = {
+                f: _file_signature(os.path.join(self.storage_path, f))
+                for f in sorted(CRITICAL_LOGIN_FILES)
+            }
+            
+            # 目录的修改时间只在增删文件时更新，文件原地改写时不变，
+            # 因此缓存键还要包含关键文件各自的大小和修改时间
+            check_key = (mtime, tuple(critical.values()))
+            if check_key == self._login_check_key:
+                self.logger.debug("登录数据未变化，沿用上次验证结果")
+                return self._login_check_result
             
-            missing_critical = [f for f in critical_files if f not in existing_files]
+            # 先直接检查关键文件，缺失时无需遍历整个目录
+            missing_critical = [f for f, signature in critical.items() if signature is None]
             if missing_critical:
-                self.logger.warning(f"缺少关键登录文件: {missing_critical}")
+                # 只需找到一个文件即可区分“目录为空”和“缺少关键文件”
+                if not any(True for _ in self._iter_files()):
+                    self.logger.warning("登录数据目录为空")
+                else:
+                    self.logger.warning(f"缺少关键登录文件: {missing_critical}")
+                self._login_check_key, self._login_check_result = check_key, False
                 return False  # 如果缺少关键文件，直接返回无效
             else:
                 self.logger.debug("✓ 关键登录文件检查通过")
-                
-            # 不再检查可选文件，因为现代WebKit数据结构变化很大
-            # "Web Data", "Local Storage" 等文件可能不存在，这是正常的
             
-            # 检查文件大小 - 调整阈值，journal文件为空是正常的
-            normal_empty_files = ["-journal", "-wal", "-shm"]  # SQLite的辅助文件通常为空或很小
+            # 单次遍历目录，同时完成过小文件和有效文件统计
             tiny_files = []
+            valid_count = 0
             
-            for file_info in data_info["files"]:
-                file_name = file_info["name"]
-                file_size = file_info["size"]
-                
-                # 检查是否是正常的空文件类型
-                is_normal_empty = any(suffix in file_name for suffix in normal_empty_files)
+            for name, size, _ in self._scan_storage():
+                if size > 0:
+                    valid_count += 1
                 
                 # 调整阈值：只有小于10字节的非空文件才被视为异常
                 # 这样可以避免对正常配置文件（如user_prefs.json）的误报
-                if not is_normal_empty and file_size < 10:
-                    tiny_files.append(file_name)
+                if size < TINY_FILE_THRESHOLD and not any(suffix in name for suffix in SQLITE_AUX_SUFFIXES):
+                    tiny_files.append(name)
+                
+            # 不再检查可选文件，因为现代WebKit数据结构变化很大
+            # "Web Data", "Local Storage" 等文件可能不存在，这是正常的
             
             if tiny_files:
                 self.logger.warning(f"检测到过小的文件（可能损坏）: {tiny_files}")
@@ -228,12 +481,12 @@ class ProfileManager:
                 self.logger.debug("文件大小检查通过，无异常小文件")
             
             # 至少有一个数据文件且有内容
-            valid_files = [f for f in data_info["files"] if f["size"] > 0]
-            is_valid = len(valid_files) > 0
+            is_valid = valid_count > 0
             
             self.logger.info(f"登录数据验证结果: {'有效' if is_valid else '无效'}")
-            self.logger.info(f"有效文件数量: {len(valid_files)}")
+            self.logger.info(f"有效文件数量: {valid_count}")
             
+            self._login_check_key, self._login_check_result = check_key, is_valid
             return is_valid
             
         except Exception as e:
@@ -245,20 +498,35 @@ class ProfileManager:
         try:
             self.logger.info("开始清理无效登录数据...")
             
-            data_info = self.get_login_data_info()
-            if data_info["status"] in ["no_data", "empty"]:
+            if not os.path.exists(self.storage_path):
+                self.logger.info("没有数据需要清理")
+                return
+            
+            # 先收集空文件再删除，避免在遍历目录的同时修改目录
+            has_files = False
+            empty_files = []
+            for name, size, _ in self._scan_storage():
+                has_files = True
+                if size == 0:
+                    empty_files.append(Path(self.storage_path, name))
+            
+            if not has_files:
                 self.logger.info("没有数据需要清理")
                 return
             
             cleaned_count = 0
-            for file_info in data_info["files"]:
-                if file_info["size"] == 0:
-                    try:
-                        os.remove(file_info["path"])
-                        self.logger.info(f"删除空文件: {file_info['name']}")
-                        cleaned_count += 1
-                    except Exception as e:
-                        self.logger.warning(f"删除文件失败 {file_info['name']}: {e}")
+            for file_path in empty_files:
+                try:
+                    file_path.unlink()
+                    self.logger.debug(f"删除空文件: {file_path.name}")
+                    cleaned_count += 1
+                except FileNotFoundError:
+                    pass  # 文件已被其他进程删除
+                except OSError as e:
+                    self.logger.warning(f"删除文件失败 {file_path.name}: {e}")
+            
+            if cleaned_count:
+                self._scan_cache = None  # 目录内容已变化，丢弃扫描快照
             
             self.logger.info(f"清理完成，删除了 {cleaned_count} 个无效文件")
             
@@ -277,14 +545,14 @@ class ProfileManager:
                 self.logger.warning("没有数据需要备份")
                 return False
             
-            # 如果备份已存在，先删除
-            if os.path.exists(backup_path):
-                import shutil
-                shutil.rmtree(backup_path)
+            # 如果备份已存在，先删除（直接尝试删除，省去一次存在性检查）
+            try:
+                _fast_rmtree(backup_path)
                 self.logger.debug(f"删除已存在的备份目录: {backup_path}")
+            except FileNotFoundError:
+                pass
             
-            import shutil
-            shutil.copytree(self.storage_path, backup_path)
+            shutil.copytree(self.storage_path, backup_path, copy_function=_clone_file)
             
             self.logger.info(f"登录数据备份成功: {backup_path}")
             return True
@@ -304,13 +572,14 @@ class ProfileManager:
             self.backup_login_data("before_restore")
             
             # 删除当前数据
-            if os.path.exists(self.storage_path):
-                import shutil
-                shutil.rmtree(self.storage_path)
+            try:
+                _fast_rmtree(self.storage_path)
+            except FileNotFoundError:
+                pass
             
             # 恢复数据
-            import shutil
-            shutil.copytree(backup_path, self.storage_path)
+            shutil.copytree(backup_path, self.storage_path, copy_function=_clone_file)
+            self._scan_cache = None  # 目录内容已替换，丢弃扫描快照
             
             self.logger.info(f"登录数据恢复成功: {backup_path}")
             return True
@@ -321,29 +590,36 @@ class ProfileManager:
     
     def get_window_settings_path(self) -> str:
         """获取窗口设置文件路径"""
-        return os.path.join(self.storage_path, "window_settings.json")
+        return self._window_settings_path
+    
+    def get_window_geometry_path(self) -> str:
+        """获取窗口几何数据文件路径（原始字节）"""
+        return self._window_geometry_path
     
     def save_window_geometry(self, geometry_bytes: bytes, maximized: bool = False) -> bool:
         """保存窗口几何信息"""
         try:
             settings_path = self.get_window_settings_path()
+            geometry_path = self.get_window_geometry_path()
+            
+            # 与上次保存的内容一致时跳过写入
+            geometry_state = (bytes(geometry_bytes), maximized)
+            if geometry_state == self._saved_geometry and os.path.exists(settings_path):
+                self.logger.debug("窗口几何信息未变化，跳过保存")
+                return True
             
-            # 将几何数据编码为base64字符串
-            geometry_b64 = base64.b64encode(geometry_bytes).decode('utf-8')
+            # 几何数据以原始字节写入独立文件，无需base64编码
+            _atomic_write_bytes(geometry_path, geometry_bytes)
             
             window_settings = {
-                "geometry": geometry_b64,
                 "maximized": maximized,
-                "last_saved": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "version": "1.0"
+                "last_saved": _now_str(),
+                "version": "2.0"
             }
             
             # 原子写入，避免文件损坏
-            temp_path = settings_path + ".tmp"
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(window_settings, f, indent=2, ensure_ascii=False)
-            
-            os.replace(temp_path, settings_path)
+            _atomic_write_bytes(settings_path, _dumps_json(window_settings))
+            self._saved_geometry = geometry_state
             
             self.logger.debug(f"窗口几何信息已保存: {settings_path}")
             return True
@@ -365,20 +641,28 @@ class ProfileManager:
                     "valid": False
                 }
             
-            with open(settings_path, 'r', encoding='utf-8') as f:
-                window_settings = json.load(f)
-            
-            # 验证数据完整性
-            if not all(key in window_settings for key in ["geometry", "maximized"]):
-                self.logger.warning("窗口设置文件格式不完整")
-                return {
-                    "geometry": None,
-                    "maximized": False,
-                    "valid": False
-                }
+            with open(settings_path, 'rb') as f:
+                window_settings = _loads_json(f.read())
             
-            # 解码几何数据
-            geometry_bytes = base64.b64decode(window_settings["geometry"].encode('utf-8'))
+            if "geometry" in window_settings:
+                # 旧版格式：几何数据以base64内嵌在JSON中，解码一次后迁移为新格式
+                import base64
+                geometry_bytes = base64.b64decode(window_settings["geometry"].encode('utf-8'))
+                maximized = window_settings.get("maximized", False)
+                if self.save_window_geometry(geometry_bytes, maximized):
+                    self.logger.info("窗口设置已迁移为新格式")
+            else:
+                geometry_path = self.get_window_geometry_path()
+                if "maximized" not in window_settings or not os.path.exists(geometry_path):
+                    self.logger.warning("窗口设置文件格式不完整")
+                    return {
+                        "geometry": None,
+                        "maximized": False,
+                        "valid": False
+                    }
+                
+                geometry_bytes = Path(geometry_path).read_bytes()
+                self._saved_geometry = (geometry_bytes, window_settings["maximized"])
             
             result = {
                 "geometry": geometry_bytes,
@@ -402,11 +686,17 @@ class ProfileManager:
         """重置窗口设置"""
         try:
             settings_path = self.get_window_settings_path()
+            geometry_path = self.get_window_geometry_path()
+            
+            try:
+                os.remove(geometry_path)
+            except FileNotFoundError:
+                pass
             
-            if os.path.exists(settings_path):
+            try:
                 os.remove(settings_path)
                 self.logger.info("窗口设置已重置")
-            else:
+            except FileNotFoundError:
                 self.logger.debug("窗口设置文件不存在，无需重置")
             
             return True
@@ -417,23 +707,30 @@ class ProfileManager:
 
     def get_user_preferences_path(self) -> str:
         """获取用户偏好设置文件路径"""
-        return os.path.join(self.storage_path, "user_preferences.json")
+        return self._user_preferences_path
     
     def save_user_preferences(self, preferences: Dict[str, Any]) -> bool:
         """保存用户偏好设置"""
         try:
             preferences_path = self.get_user_preferences_path()
             
-            # 添加版本信息和时间戳
+            # 添加版本信息
             preferences["version"] = "1.0"
-            preferences["last_updated"] = time.strftime("%Y-%m-%d %H:%M:%S")
             
-            # 原子写入，避免文件损坏
-            temp_path = preferences_path + ".tmp"
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(preferences, f, indent=2, ensure_ascii=False)
+            # 内容与磁盘上一致时跳过写入
+            content_hash = _content_hash(preferences)
+            if content_hash == self._prefs_hash and os.path.exists(preferences_path):
+                self.logger.debug("用户偏好设置未变化，跳过保存")
+                return True
+            
+            preferences["last_updated"] = _now_str()
             
-            os.replace(temp_path, preferences_path)
+            # 原子写入，避免文件损坏
+            _atomic_write_bytes(preferences_path, _dumps_json(preferences))
+            self._prefs_hash = content_hash
+            # 缓存独立的副本，调用方之后修改传入的字典不会影响缓存
+            self._prefs = copy.deepcopy(preferences)
+            self._prefs_mtime = _mtime_ns(self._user_preferences_path)
             
             self.logger.debug(f"用户偏好设置已保存: {preferences_path}")
             return True
@@ -443,24 +740,42 @@ class ProfileManager:
             return False
     
     def load_user_preferences(self) -> Dict[str, Any]:
-        """加载用户偏好设置"""
+        """加载用户偏好设置（文件未修改时返回内存缓存的深拷贝）"""
         try:
+            # 存在尚未写入的修改时，内存中的版本才是最新的
+            if self._prefs_dirty:
+                return copy.deepcopy(self._prefs)
+            
+            mtime = _mtime_ns(self._user_preferences_path)
+            if self._prefs is not None and mtime == self._prefs_mtime:
+                return copy.deepcopy(self._prefs)
+            
             preferences_path = self.get_user_preferences_path()
             
-            if not os.path.exists(preferences_path):
+            if mtime is None:
                 self.logger.debug("用户偏好设置文件不存在，返回默认设置")
-                return self._get_default_user_preferences()
+                self._prefs_hash = None
+                self._prefs = self._get_default_user_preferences()
+                self._prefs_mtime = mtime
+                return copy.deepcopy(self._prefs)
             
-            with open(preferences_path, 'r', encoding='utf-8') as f:
-                preferences = json.load(f)
+            with open(preferences_path, 'rb') as f:
+                preferences = _loads_json(f.read())
             
             # 验证数据完整性
             if "close_behavior" not in preferences:
                 self.logger.warning("用户偏好设置文件格式不完整，使用默认设置")
-                return self._get_default_user_preferences()
-            
+                self._prefs_hash = None
+                self._prefs = self._get_default_user_preferences()
+                self._prefs_mtime = mtime
+                return copy.deepcopy(self._prefs)
+            
+            self._prefs_hash = _content_hash(preferences)
+            self._prefs = preferences
+            self._prefs_mtime = mtime
             self.logger.debug(f"用户偏好设置加载成功，最后更新: {preferences.get('last_updated', 'unknown')}")
-            return preferences
+            # 返回副本，调用方修改结果不会影响缓存
+            return copy.deepcopy(preferences)
             
         except Exception as e:
             self.logger.error(f"加载用户偏好设置失败: {e}")
@@ -483,11 +798,15 @@ class ProfileManager:
             preferences = self.load_user_preferences()
             
             # 更新关闭行为设置
-            preferences["close_behavior"]["action"] = action
-            preferences["close_behavior"]["remember_choice"] = remember_choice
-            preferences["close_behavior"]["first_time"] = False
+            close_behavior = preferences.get("close_behavior") or {}
+            close_behavior["action"] = action
+            close_behavior["remember_choice"] = remember_choice
+            close_behavior["first_time"] = False
+            preferences["close_behavior"] = close_behavior
             
-            return self.save_user_preferences(preferences)
+            # 将修改后的设置写回内存缓存，由防抖定时器统一写入磁盘
+            self._prefs = preferences
+            return self._queue_preferences_save()
             
         except Exception as e:
             self.logger.error(f"更新关闭行为偏好失败: {e}")
@@ -496,8 +815,10 @@ class ProfileManager:
     def get_close_behavior(self) -> Dict[str, Any]:
         """获取关闭行为偏好"""
         try:
-            preferences = self.load_user_preferences()
-            return preferences.get("close_behavior", self._get_default_user_preferences()["close_behavior"])
+            close_behavior = self.load_user_preferences().get("close_behavior")
+            if close_behavior is None:
+                return self._get_default_user_preferences()["close_behavior"]
+            return close_behavior
             
         except Exception as e:
             self.logger.error(f"获取关闭行为偏好失败: {e}")
@@ -505,7 +826,7 @@ class ProfileManager:
     
     def get_pipewire_config_path(self) -> str:
         """获取PipeWire配置文件路径"""
-        return os.path.join(self.storage_path, "pipewire_config.json")
+        return self._pipewire_config_path
     
     def save_pipewire_config(self, config: Dict[str, Any]) -> bool:
         """保存PipeWire配置"""
@@ -514,17 +835,29 @@ class ProfileManager:
             
             # 添加版本信息和时间戳
             config["version"] = "1.0"
-            config["last_updated"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            config["last_updated"] = _now_str()
             
             # 验证配置
             validated_config = self._validate_pipewire_config(config)
+            # 直接保存的配置覆盖尚未写入的修改
+            self._pw_pending = None
+            
+            # 与磁盘上的内容一致（缓存有效且文件未被外部修改）时跳过写入
+            if (
+                validated_config == self._pw_cache
+                and self._pw_mtime is not None
+                and _mtime_ns(config_path) == self._pw_mtime
+            ):
+                self.logger.debug("PipeWire配置未变化，跳过保存")
+                return True
             
             # 原子写入，避免文件损坏
-            temp_path = config_path + ".tmp"
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(validated_config, f, indent=2, ensure_ascii=False)
+            _atomic_write_bytes(config_path, _dumps_json(validated_config))
             
-            os.replace(temp_path, config_path)
+            # 直接以写入的内容更新缓存，无需重新读取
+            self._pw_cache = validated_config
+            self._pw_mtime = _mtime_ns(config_path)
+            self._next_restart_ts = validated_config.get("next_restart_timestamp", 0.0)
             
             self.logger.debug(f"PipeWire配置已保存: {config_path}")
             return True
@@ -534,19 +867,30 @@ class ProfileManager:
             return False
     
     def load_pipewire_config(self) -> Dict[str, Any]:
-        """加载PipeWire配置"""
+        """加载PipeWire配置（文件未修改时返回缓存的副本）"""
         try:
+            # 存在尚未写入的修改时，以待保存的配置为准
+            if self._pw_pending is not None:
+                return self._pw_pending.copy()
+            
             config_path = self.get_pipewire_config_path()
             
-            if not os.path.exists(config_path):
+            mtime = _mtime_ns(config_path)
+            if mtime is None:
                 self.logger.debug("PipeWire配置文件不存在，返回默认配置")
                 return self._get_default_pipewire_config()
             
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            # 返回副本，调用方修改配置后再保存不会影响缓存
+            if self._pw_cache is not None and mtime == self._pw_mtime:
+                return self._pw_cache.copy()
+            
+            with open(config_path, 'rb') as f:
+                config = _loads_json(f.read())
             
             # 验证配置完整性
             validated_config = self._validate_pipewire_config(config)
+            self._pw_cache = validated_config.copy()
+            self._pw_mtime = mtime
             
             self.logger.debug(f"PipeWire配置加载成功，最后更新: {config.get('last_updated', 'unknown')}")
             return validated_config
@@ -586,6 +930,54 @@ class ProfileManager:
             self.logger.error(f"验证PipeWire配置失败: {e}")
             return self._get_default_pipewire_config()
     
+    def _queue_pipewire_save(self, config: Dict[str, Any]) -> bool:
+        """记录待保存的PipeWire配置，由防抖定时器统一写入磁盘"""
+        self._pw_pending = self._validate_pipewire_config(config)
+        self._next_restart_ts = self._pw_pending.get("next_restart_timestamp", 0.0)
+        self._schedule_flush()
+        return True
+    
+    def _queue_preferences_save(self) -> bool:
+        """标记偏好设置缓存已修改，由防抖定时器统一写入磁盘"""
+        self._prefs_dirty = True
+        self._schedule_flush()
+        return True
+    
+    def _schedule_flush(self):
+        """安排一次延迟写入，合并窗口内的多次修改"""
+        if self._flush_scheduled:
+            return
+        
+        # 没有Qt事件循环时定时器不会触发，直接写入
+        if QCoreApplication.instance() is None:
+            self.flush_now()
+            return
+        
+        self._flush_scheduled = True
+        QTimer.singleShot(SAVE_DEBOUNCE_MS, self.flush_now)
+    
+    def flush_now(self) -> bool:
+        """立即写入所有尚未保存的配置修改"""
+        self._flush_scheduled = False
+        success = True
+        
+        try:
+            if self._pw_pending is not None:
+                success = self.save_pipewire_config(self._pw_pending) and success
+            
+            if self._prefs_dirty:
+                self._prefs_dirty = False
+                if not self.save_user_preferences(self._prefs):
+                    # 写入失败时丢弃已修改的缓存，下次从磁盘重新加载
+                    self._prefs = None
+                    success = False
+            
+            return success
+            
+        except Exception as e:
+            self.logger.error(f"写入待保存的配置失败: {e}")
+            return False
+    
     def _get_default_pipewire_config(self) -> Dict[str, Any]:
         """获取默认PipeWire配置 - 用户可配置版本"""
         return {
@@ -610,7 +1002,7 @@ class ProfileManager:
             config["skip_next_restart"] = False
             
             # 保存配置
-            success = self.save_pipewire_config(config)
+            success = self._queue_pipewire_save(config)
             
             if success:
                 self.logger.info(f"PipeWire重启时间已更新: 上次={restart_timestamp}")
@@ -627,7 +1019,8 @@ class ProfileManager:
         """获取下次PipeWire重启时间"""
         try:
             config = self.load_pipewire_config()
-            return config.get("next_restart_timestamp", 0.0)
+            self._next_restart_ts = config.get("next_restart_timestamp", 0.0)
+            return self._next_restart_ts
         except Exception as e:
             self.logger.error(f"获取下次PipeWire重启时间失败: {e}")
             return 0.0
@@ -635,11 +1028,17 @@ class ProfileManager:
     def is_pipewire_restart_due(self) -> bool:
         """检查是否到了PipeWire重启时间"""
         try:
-            current_time = time.time()
-            next_restart_time = self.get_pipewire_next_restart_time()
+            # 优先使用缓存的下次重启时间，轮询时无需读取配置文件
+            next_restart_time = self._next_restart_ts
+            if next_restart_time is None:
+                next_restart_time = self.get_pipewire_next_restart_time()
+            
+            if next_restart_time <= 0:
+                return False
             
             # 检查是否到了重启时间
-            is_due = current_time >= next_restart_time and next_restart_time > 0
+            current_time = time.time()
+            is_due = current_time >= next_restart_time
             
             if is_due:
                 self.logger.info(f"PipeWire重启时间已到: 当前={current_time}, 计划={next_restart_time}")
@@ -665,7 +1064,7 @@ class ProfileManager:
             config = self.load_pipewire_config()
             config["skip_next_restart"] = skip
             
-            success = self.save_pipewire_config(config)
+            success = self._queue_pipewire_save(config)
             
             if success:
                 self.logger.info(f"PipeWire跳过重启标志已设置: {skip}")
@@ -676,6 +1075,15 @@ class ProfileManager:
             self.logger.error(f"设置PipeWire跳过重启标志失败: {e}")
             return False
     
+    def is_show_notifications_enabled(self) -> bool:
+        """检查是否显示PipeWire重启通知"""
+        try:
+            # load_pipewire_config按文件修改时间缓存，外部修改也能及时生效
+            return bool(self.load_pipewire_config().get("show_notifications", True))
+        except Exception as e:
+            self.logger.error(f"检查PipeWire通知设置失败: {e}")
+            return True
+    
     def is_pipewire_auto_restart_enabled(self) -> bool:
         """检查PipeWire自动重启是否启用"""
         try:
@@ -702,7 +1110,7 @@ class ProfileManager:
                 config["next_restart_timestamp"] = 0.0
                 self.logger.info("PipeWire自动重启已禁用")
             
-            success = self.save_pipewire_config(config)
+            success = self._queue_pipewire_save(config)
             return success
             
         except Exception as e:
@@ -734,7 +1142,7 @@ class ProfileManager:
                 config["next_restart_timestamp"] = next_restart_time
                 self.logger.info(f"PipeWire重启间隔已更新: {interval_hours}小时, 下次重启: {next_restart_time}")
             
-            success = self.save_pipewire_config(config)
+            success = self._queue_pipewire_save(config)
             return success
             
         except Exception as e:
@@ -752,7 +1160,7 @@ class ProfileManager:
             # 格式化上次重启时间
             last_restart = config.get("last_restart_timestamp", 0.0)
             if last_restart > 0:
-                config["last_restart_formatted"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last_restart))
+                config["last_restart_formatted"] = _format_timestamp(last_restart)
                 config["last_restart_relative"] = self._format_relative_time(current_time - last_restart)
             else:
                 config["last_restart_formatted"] = "从未重启"
@@ -761,7 +1169,7 @@ class ProfileManager:
             # 格式化下次重启时间
             next_restart = config.get("next_restart_timestamp", 0.0)
             if next_restart > 0:
-                config["next_restart_formatted"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(next_restart))
+                config["next_restart_formatted"] = _format_timestamp(next_restart)
                 if current_time < next_restart:
                     config["next_restart_countdown"] = self._format_relative_time(next_restart - current_time)
                     config["restart_overdue"] = False
@@ -786,25 +1194,19 @@ class ProfileManager:
                 return "未知"
             elif seconds < 0:
                 return "刚刚"
-            elif seconds < 60:
-                return f"{int(seconds)}秒"
-            elif seconds < 3600:
-                minutes = int(seconds // 60)
+            
+            # 一次divmod拆分出各单位，只显示最大单位及其相邻的非零单位
+            days, remainder = divmod(int(seconds), 86400)
+            hours, remainder = divmod(remainder, 3600)
+            minutes, secs = divmod(remainder, 60)
+            
+            if days:
+                return f"{days}天{hours}小时" if hours else f"{days}天"
+            if hours:
+                return f"{hours}小时{minutes}分钟" if minutes else f"{hours}小时"
+            if minutes:
                 return f"{minutes}分钟"
-            elif seconds < 86400:
-                hours = int(seconds // 3600)
-                minutes = int((seconds % 3600) // 60)
-                if minutes > 0:
-                    return f"{hours}小时{minutes}分钟"
-                else:
-                    return f"{hours}小时"
-            else:
-                days = int(seconds // 86400)
-                hours = int((seconds % 86400) // 3600)
-                if hours > 0:
-                    return f"{days}天{hours}小时"
-                else:
-                    return f"{days}天"
+            return f"{secs}秒"
         except Exception:
             return "时间格式化失败"
 
@@ -815,6 +1217,9 @@ class ProfileManager:
     def close(self):
         """关闭Profile管理器"""
         try:
+            # 退出前写入尚未保存的配置修改
+            self.flush_now()
+            
             if self.profile:
                 self.profile.deleteLater()
                 self.profile = None
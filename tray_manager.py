@@ -9,7 +9,7 @@ import os
 import time
 from typing import Optional
 from PySide6.QtWidgets import QSystemTrayIcon, QMenu
-from PySide6.QtCore import QObject, Signal, QTimer
+from PySide6.QtCore import Qt, QObject, Signal, QTimer
 from PySide6.QtGui import QIcon, QAction
 
 # 导入日志系统
@@ -265,9 +265,13 @@ class TrayManager(QObject):
         """启动PipeWire检查定时器"""
         try:
             if self.pipewire_timer:
+                # 断开旧定时器的连接并释放，避免其继续持有回调
                 self.pipewire_timer.stop()
+                self.pipewire_timer.timeout.disconnect()
+                self.pipewire_timer.deleteLater()
             
             self.pipewire_timer = QTimer()
+            self.pipewire_timer.setTimerType(Qt.TimerType.CoarseTimer)
             self.pipewire_timer.timeout.connect(self._check_pipewire_restart)
             self.pipewire_timer.start(60000)  # 每分钟检查一次
             
@@ -334,7 +338,7 @@ class TrayManager(QObject):
             self.logger.info("开始执行PipeWire自动重启...")
             
             # 显示通知
-            if self.profile_manager.get_pipewire_full_config().get("show_notifications", True):
+            if self.profile_manager.is_show_notifications_enabled():
                 self._show_restart_notification("正在重启PipeWire音频服务...")
             
             # 请求重启
@@ -391,14 +395,14 @@ class TrayManager(QObject):
                 self.profile_manager.update_pipewire_restart_time(current_time)
                 
                 # 显示成功通知
-                if self.profile_manager.get_pipewire_full_config().get("show_notifications", True):
+                if self.profile_manager.is_show_notifications_enabled():
                     self._show_restart_notification("PipeWire音频服务重启成功")
                     
             else:
                 self.logger.error(f"PipeWire自动重启失败: {message}")
                 
                 # 显示失败通知
-                if self.profile_manager.get_pipewire_full_config().get("show_notifications", True):
+                if self.profile_manager.is_show_notifications_enabled():
                     self._show_restart_notification(f"PipeWire重启失败: {message}", error=True)
                     
         except Exception as e: